@@ -1 +1,8 @@
 ADMIN_IDS = {1150875355}
+
+# Immutable, int-normalised copy shared by every feature's admin check.
+ADMIN_ID_SET = frozenset(int(x) for x in ADMIN_IDS)
+
+
+def is_admin(user_id) -> bool:
+    return user_id in ADMIN_ID_SET
@@ -387,5 +387,15 @@ else:
         }
     }
 
-    with open(BOOKS_FILE, "w") as f:
-        json.dump(BOOKS, f, indent=4)
+    # encode once and write in one call; the rename keeps a crash from
+    # leaving a truncated books_data.json that would fail json.load above
+    payload = json.dumps(BOOKS, indent=4).encode("utf-8")
+    tmp_path = BOOKS_FILE + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:  # os.write may be partial
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, BOOKS_FILE)
@@ -29,18 +29,27 @@ SQLITE_TIMEOUT = 5  # keep short to avoid blocking startup
 _PRAGMAS = [
     ("journal_mode", "WAL"),
     ("synchronous", "NORMAL"),
+    ("temp_store", "MEMORY"),   # sorts/temp b-trees stay off disk
 ]
 
 
+_DB_DIR_READY = False  # set once the directory is known to exist
+
+
 def _ensure_db_dir():
     """Best-effort create DB directory. Do not fail on error."""
+    global _DB_DIR_READY
+    if _DB_DIR_READY:
+        return
     dirname = os.path.dirname(DB_PATH)
     if not dirname:
+        _DB_DIR_READY = True
         return
     try:
         if not os.path.exists(dirname):
             os.makedirs(dirname, exist_ok=True)
             logger.debug("Created DB directory %s", dirname)
+        _DB_DIR_READY = True
     except Exception as e:
         logger.debug("Could not ensure DB directory exists %s: %s", dirname, e)
 
@@ -86,12 +95,27 @@ def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
         return []
 
 
+_USERS_COLS: Optional[List[str]] = None  # users schema; only ensure_db() alters it
+
+
+def _users_columns(conn: sqlite3.Connection) -> List[str]:
+    """Cached column list of the users table (not cached while unreadable)."""
+    global _USERS_COLS
+    if _USERS_COLS is None:
+        cols = _table_columns(conn, "users")
+        if not cols:
+            return cols
+        _USERS_COLS = cols
+    return _USERS_COLS
+
+
 def ensure_db():
     """
     Ensure users table exists. Quick and non-blocking where possible.
     If columns are missing, attempt to ALTER TABLE ADD COLUMN (non-destructive).
     Any errors are logged and ignored so the process can continue.
     """
+    global _USERS_COLS
     logger.debug("ensure_db: starting (DB_PATH=%s)", DB_PATH)
     _ensure_db_dir()
 
@@ -130,6 +154,7 @@ def ensure_db():
                 except Exception as e:
                     # log but don't stop startup
                     logger.warning("ensure_db: failed to add column %s: %s", c, e)
+            _USERS_COLS = None
     except Exception as e:
         logger.exception("ensure_db: unexpected error: %s", e)
     finally:
@@ -317,7 +342,7 @@ def get_all_users(as_rows: bool = False) -> List[Union[int, Tuple]]:
     conn = None
     try:
         conn = _connect()
-        cols = _table_columns(conn, "users")
+        cols = _users_columns(conn)
         order_by = "added_at DESC" if "added_at" in cols else "user_id DESC"
 
         if as_rows:
@@ -363,7 +388,7 @@ def get_all_users_in_chunks(chunk_size: int = 1000) -> Generator[List[int], None
     conn = None
     try:
         conn = _connect()
-        cols = _table_columns(conn, "users")
+        cols = _users_columns(conn)
         order_by = "added_at DESC" if "added_at" in cols else "user_id DESC"
         offset = 0
         while True:
@@ -522,7 +547,7 @@ def sample_users(limit: int = 10) -> List[Tuple]:
     conn = None
     try:
         conn = _connect()
-        cols = _table_columns(conn, "users")
+        cols = _users_columns(conn)
         select_cols = []
         out_cols = []
         if "user_id" in cols:
@@ -615,6 +640,12 @@ def ensure_test_defs_table():
             conn.close()
 
 
+# test_id → test_defs row. Rows are insert-only, so a hit never goes stale;
+# misses are not cached because the test may be created later.
+_TEST_DEF_CACHE: dict = {}
+_TEST_DEF_CACHE_MAX = 256
+
+
 def save_test_definition(
     test_id: str,
     name: Optional[str],
@@ -645,6 +676,7 @@ def save_test_definition(
                     int(time.time()),
                 ),
             )
+        _TEST_DEF_CACHE.pop(test_id, None)
         return True
     except Exception as e:
         logger.exception("save_test_definition failed for %s: %s", test_id, e)
@@ -712,17 +744,24 @@ def save_test_question(
     test_id: str,
     question_number: int,
     question_text: str,
-    answers: dict,
+    answers: tuple,
     correct_answer: str,
 ) -> bool:
     """
     Save a single question for a test.
+    answers: (a, b, c, d)
+    An existing row with the same question_number is replaced, so callers
+    can write each question as soon as it is complete and overwrite it on edit.
     """
     ensure_test_questions_table()
     conn = None
     try:
         conn = _connect()
         with conn:
+            conn.execute(
+                "DELETE FROM test_questions WHERE test_id = ? AND question_number = ?;",
+                (test_id, question_number),
+            )
             conn.execute(
                 """
                 INSERT INTO test_questions
@@ -733,10 +772,7 @@ def save_test_question(
                     test_id,
                     question_number,
                     question_text,
-                    answers["a"],
-                    answers["b"],
-                    answers["c"],
-                    answers["d"],
+                    *answers,
                     correct_answer,
                     int(time.time()),
                 ),
@@ -753,6 +789,10 @@ def get_test_definition(test_id: str):
     """
     Return test definition from test_defs.
     """
+    row = _TEST_DEF_CACHE.get(test_id)
+    if row is not None:
+        return row
+
     ensure_test_defs_table()
     conn = None
     try:
@@ -766,7 +806,12 @@ def get_test_definition(test_id: str):
             """,
             (test_id,),
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+        if row is not None:
+            if len(_TEST_DEF_CACHE) >= _TEST_DEF_CACHE_MAX:
+                _TEST_DEF_CACHE.clear()
+            _TEST_DEF_CACHE[test_id] = row
+        return row
     except Exception as e:
         logger.exception("get_test_definition failed for %s: %s", test_id, e)
         return None
@@ -932,7 +977,12 @@ def save_test_score(
     max_score: int = 100,
     time_left: Optional[int] = None,
     auto_finished: Optional[bool] = None,
+    clear_mode: bool = False,
 ) -> bool:
+    """
+    With clear_mode=True the user's mode row is dropped in the same
+    transaction, so finishing a test is one DB round-trip.
+    """
     ensure_test_scores_table()
     conn = None
     try:
@@ -969,6 +1019,8 @@ def save_test_score(
                    int(auto_finished) if auto_finished is not None else None,
                    ),
             )
+            if clear_mode:
+                conn.execute("DELETE FROM user_modes WHERE user_id = ?;", (int(user_id),))
         return True
     except Exception as e:
         logger.exception("save_test_score failed for token %s: %s", token, e)
@@ -1508,31 +1560,43 @@ def log_command_use(command: str) -> None:
         if conn:
             conn.close()
 
-def get_command_usage_stats():
+def get_command_usage_stats(commands: Optional[Iterable[str]] = None):
     """
     Returns list of:
     (command, last_24h_count, total_count)
     Ordered by total_count DESC.
+
+    If `commands` is given, only those commands are counted (filtered in SQL).
     """
     ensure_command_usage_table()
 
     now = int(time.time())
     last_24h_border = now - 86400  # 24 hours
 
+    params: List = [last_24h_border]
+    where = ""
+    if commands is not None:
+        commands = list(commands)
+        if not commands:
+            return []
+        where = f"WHERE command IN ({', '.join('?' * len(commands))})"
+        params.extend(commands)
+
     conn = None
     try:
         conn = _connect()
         cur = conn.execute(
-            """
+            f"""
             SELECT
                 command,
                 SUM(CASE WHEN timestamp >= ? THEN 1 ELSE 0 END) AS last_24h,
                 COUNT(*) AS total
             FROM command_usage
+            {where}
             GROUP BY command
             ORDER BY total DESC;
             """,
-            (last_24h_border,),
+            params,
         )
         return cur.fetchall()
     except Exception as e:
@@ -1969,6 +2033,27 @@ def get_invited_users(inviter_id: int) -> list:
     finally:
         if conn:
             conn.close()
+
+
+def analyze_db():
+    """
+    Gather query-planner statistics (ANALYZE) once at startup.
+    PRAGMA optimize is a no-op on a fresh connection that has run no
+    queries, so this runs ANALYZE directly; analysis_limit keeps it cheap
+    on big tables. Best-effort.
+    """
+    conn = None
+    try:
+        conn = _connect()
+        conn.execute("PRAGMA analysis_limit = 400;")
+        conn.execute("ANALYZE;")
+    except Exception as e:
+        logger.debug("ANALYZE failed (non-fatal): %s", e)
+    finally:
+        if conn:
+            conn.close()
+
+
 # ensure referrals table on import (best-effort)
 ensure_referrals_table()
 ensure_referral_meta_table()
@@ -1987,3 +2072,5 @@ ensure_book_usage_table()
 ensure_ai_usage_table()
 ensure_user_modes_table()
 ensure_test_program_state_table()
+# refresh planner stats once tables exist (best-effort)
+analyze_db()
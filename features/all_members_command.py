@@ -20,7 +20,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 
 from database import get_all_users
-from admins import ADMIN_IDS
+from admins import is_admin
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -41,10 +41,6 @@ class BroadcastState(StatesGroup):
 
 
 # ─────────────── utils ───────────────
-def is_admin(user_id: int) -> bool:
-    return int(user_id) in set(map(int, ADMIN_IDS))
-
-
 def parse_ids(text: str) -> List[int]:
     cleaned = text.replace(",", " ").replace("\n", " ")
     out = []
@@ -21,7 +21,7 @@ from aiogram.types import Message
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
-from admins import ADMIN_IDS
+from admins import is_admin
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -43,10 +43,6 @@ CMD_PATTERNS = [
 # utils
 # ─────────────────────────────
 
-def is_admin(user_id: int) -> bool:
-    return int(user_id) in set(map(int, ADMIN_IDS))
-
-
 def chunk_text(text: str, limit: int = TG_MSG_MAX) -> List[str]:
     parts = []
     while text:
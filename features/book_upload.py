@@ -14,12 +14,12 @@ import logging
 import os
 
 from aiogram import Router, F
-from aiogram.types import Message
+from aiogram.types import Message, MessageEntity
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 
-from admins import ADMIN_IDS
+from admins import is_admin
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -30,6 +30,10 @@ router = Router()
 
 STORAGE_CHAT_ID = int(os.getenv("STORAGE_CHAT_ID", "-1002714023986"))
 
+# Built once at import; the state filter is listed first on the handler so
+# users outside the upload flow are rejected before this is evaluated.
+MEDIA_FILTER = F.document | F.photo | F.video | F.audio | F.voice | F.animation
+
 
 # ─────────────────────────────
 # FSM
@@ -43,10 +47,6 @@ class BookUploadState(StatesGroup):
 # Utils
 # ─────────────────────────────
 
-def is_admin(user_id: int) -> bool:
-    return int(user_id) in set(map(int, ADMIN_IDS))
-
-
 def extract_file_id(msg: Message) -> str | None:
     if msg.document:
         return msg.document.file_id
@@ -63,6 +63,39 @@ def extract_file_id(msg: Message) -> str | None:
     return None
 
 
+def _utf16_len(text: str) -> int:
+    # Telegram entity offsets are counted in UTF-16 code units
+    return len(text.encode("utf-16-le")) // 2
+
+
+def format_upload_report(
+    file_id: str | None, storage_mid: int
+) -> tuple[str, list[MessageEntity]]:
+    """
+    Build the upload report with explicit `code` entities around FILE_ID and
+    the storage message id, so it can be sent with parse_mode=None and never
+    depends on escaping the id for the bot-wide HTML parse mode.
+    """
+    text = "✅ File uploaded.\n"
+    entities = []
+
+    if file_id:
+        text += "\n📂 FILE_ID (use this in books.py):\n"
+        entities.append(MessageEntity(
+            type="code", offset=_utf16_len(text), length=_utf16_len(file_id)
+        ))
+        text += file_id + "\n"
+    else:
+        text += "⚠️ Could not automatically extract FILE_ID.\n"
+
+    mid = str(storage_mid)
+    text += "\n📨 Storage message_id:\n"
+    entities.append(MessageEntity(
+        type="code", offset=_utf16_len(text), length=len(mid)
+    ))
+    return text + mid, entities
+
+
 # ─────────────────────────────
 # /book_upload
 # ─────────────────────────────
@@ -100,10 +133,7 @@ async def book_upload_cancel(message: Message, state: FSMContext):
 # File receiver
 # ─────────────────────────────
 
-@router.message(
-    BookUploadState.waiting_file,
-    F.document | F.photo | F.video | F.audio | F.voice | F.animation
-)
+@router.message(BookUploadState.waiting_file, MEDIA_FILTER)
 async def book_upload_receive_file(message: Message, state: FSMContext):
     if not is_admin(message.from_user.id):
         return
@@ -127,24 +157,8 @@ async def book_upload_receive_file(message: Message, state: FSMContext):
     file_id = extract_file_id(forwarded) or extract_file_id(message)
     storage_mid = forwarded.message_id
 
-    lines = ["✅ File uploaded."]
-
-    if file_id:
-        lines += [
-            "",
-            "📂 FILE_ID (use this in books.py):",
-            file_id,
-        ]
-    else:
-        lines.append("⚠️ Could not automatically extract FILE_ID.")
-
-    lines += [
-        "",
-        "📨 Storage message_id:",
-        str(storage_mid),
-    ]
-
-    await message.answer("\n".join(lines))
+    text, entities = format_upload_report(file_id, storage_mid)
+    await message.answer(text, parse_mode=None, entities=entities)
     logger.info(
         "Book uploaded by admin %s | file_id=%r storage_mid=%s",
         message.from_user.id,
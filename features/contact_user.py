@@ -7,6 +7,8 @@ Safe, state-isolated, async.
 
 import asyncio
 import logging
+import re
+from dataclasses import dataclass
 from typing import Optional
 
 from aiogram import Router, F
@@ -16,13 +18,19 @@ from aiogram.fsm.state import StatesGroup, State
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.storage.base import StorageKey
 from aiogram.dispatcher.dispatcher import Dispatcher
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 
-from admins import ADMIN_IDS
+from admins import is_admin
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 BRIDGE_TIMEOUT = 24 * 60 * 60  # 24 hours
+RELAY_BATCH_WINDOW = 0.05  # seconds to collect a burst before forwarding
+RELAY_BATCH_MAX = 100      # Bot API limit for forwardMessages
+
+# parsed by the router filter; the handler gets the match, not raw data
+BRIDGE_OPEN_RE = re.compile(r"^bridge_open:(\d+)$")
 
 
 # ─────────────────────────────
@@ -34,18 +42,106 @@ class ContactState(StatesGroup):
     bridge_active = State()   # active relay on both sides
 
 
+# ─────────────────────────────
+# Bridge registry
+# ─────────────────────────────
+
+@dataclass(slots=True)
+class Bridge:
+    admin_id: int
+    user_id: int
+    timer: Optional[asyncio.TimerHandle] = None  # pending auto-close
+
+    def cancel_timer(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class BiMap:
+    """Two-way admin ↔ user index; both sides share one Bridge record."""
+
+    def __init__(self):
+        self.ab: dict = {}  # admin_id → Bridge
+        self.ba: dict = {}  # user_id → Bridge
+
+    def set(self, bridge: Bridge) -> None:
+        # drop stale pairs so each side maps to exactly one peer
+        self.pop_by_a(bridge.admin_id)
+        self.pop_by_b(bridge.user_id)
+        self.ab[bridge.admin_id] = bridge
+        self.ba[bridge.user_id] = bridge
+
+    def get_by_a(self, a) -> Optional[Bridge]:
+        return self.ab.get(a)
+
+    def get_by_b(self, b) -> Optional[Bridge]:
+        return self.ba.get(b)
+
+    def pop_by_a(self, a) -> Optional[Bridge]:
+        bridge = self.ab.pop(a, None)
+        if bridge is not None:
+            self.ba.pop(bridge.user_id, None)
+            bridge.cancel_timer()
+        return bridge
+
+    def pop_by_b(self, b) -> Optional[Bridge]:
+        bridge = self.ba.pop(b, None)
+        if bridge is not None:
+            self.ab.pop(bridge.admin_id, None)
+            bridge.cancel_timer()
+        return bridge
+
+
+_bridges = BiMap()
+_relay_pending: dict = {}  # (from_chat_id, peer) → [message_id, ...]
+
+# serialises check-and-mutate of _bridges together with the FSM writes
+# that open/close a bridge, which span awaits
+_bridge_lock = asyncio.Lock()
+
+
+def peer_of(uid: int) -> Optional[int]:
+    bridge = _bridges.get_by_a(uid)
+    if bridge is not None:
+        return bridge.user_id
+    bridge = _bridges.get_by_b(uid)
+    if bridge is not None:
+        return bridge.admin_id
+    return None
+
+
+def bridge_peer(message: Message):
+    """
+    Router filter: cheap dict probe run first, so non-bridge traffic never
+    reaches relay. On a hit the peer id is handed to the handler as `peer`.
+    """
+    peer = peer_of(message.from_user.id)
+    return {"peer": peer} if peer is not None else False
+
+
 # ─────────────────────────────
 # Utils
 # ─────────────────────────────
 
-def is_admin(uid: int) -> bool:
-    return int(uid) in set(map(int, ADMIN_IDS))
+async def _delete_quietly(message: Message):
+    try:
+        await message.delete()
+    except Exception:
+        pass
 
 
 # ─────────────────────────────
 # /contact <user_id>
 # ─────────────────────────────
 
+# static, so built once rather than per /contact
+CONFIRM_KB = InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="✅ Yes", callback_data="contact_yes"),
+    InlineKeyboardButton(text="❌ No", callback_data="contact_no"),
+]])
+
+
 @router.message(Command("contact"))
 async def contact_start(message: Message, state: FSMContext):
     if not is_admin(message.from_user.id):
@@ -66,14 +162,9 @@ async def contact_start(message: Message, state: FSMContext):
     await state.set_state(ContactState.admin_confirm)
     await state.update_data(target_user=target_user)
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[[
-        InlineKeyboardButton(text="✅ Yes", callback_data="contact_yes"),
-        InlineKeyboardButton(text="❌ No", callback_data="contact_no"),
-    ]])
-
     await message.answer(
         f"User found: {target_user}\n\nSend contact invitation?",
-        reply_markup=kb
+        reply_markup=CONFIRM_KB
     )
 
 
@@ -122,14 +213,13 @@ async def contact_decision(cb: CallbackQuery, state: FSMContext):
 # User presses contact button
 # ─────────────────────────────
 
-@router.callback_query(F.data.startswith("bridge_open:"))
-async def open_bridge(cb: CallbackQuery, state: FSMContext, dispatcher: Dispatcher):
-    await cb.answer()
-
-    admin_id = int(cb.data.split(":")[1])
+@router.callback_query(F.data.regexp(BRIDGE_OPEN_RE).as_("match"))
+async def open_bridge(cb: CallbackQuery, state: FSMContext, dispatcher: Dispatcher, match: re.Match):
+    admin_id = int(match.group(1))
     user_id = cb.from_user.id
 
     if is_admin(user_id):
+        await cb.answer()
         return
 
     # ── Create FSM contexts manually (CORRECT WAY) ──
@@ -152,13 +242,34 @@ async def open_bridge(cb: CallbackQuery, state: FSMContext, dispatcher: Dispatch
     )
 
     # ── Lock both sides ──
-    await admin_ctx.set_state(ContactState.bridge_active)
-    await admin_ctx.update_data(peer=user_id)
-
-    await user_ctx.set_state(ContactState.bridge_active)
-    await user_ctx.update_data(peer=admin_id)
-
-    await cb.message.edit_text("✅ You are now connected to admin.")
+    async with _bridge_lock:
+        existing = _bridges.get_by_a(admin_id)
+        if existing is not None:
+            if existing.user_id == user_id:
+                await cb.answer("✅ Already connected.")
+            else:
+                await cb.answer("⚠️ Admin is busy with another contact. Try again later.")
+            return
+
+        # BiMap.set would silently evict the user's other bridge and strand
+        # that admin in bridge_active, so refuse instead
+        if _bridges.get_by_b(user_id) is not None:
+            await cb.answer("⚠️ You are already connected to another admin.")
+            return
+
+        await admin_ctx.set_state(ContactState.bridge_active)
+        await user_ctx.set_state(ContactState.bridge_active)
+
+        bridge = Bridge(admin_id=admin_id, user_id=user_id)
+        _bridges.set(bridge)
+        # armed before any network call so a failing reply below can
+        # never leave a bridge that does not expire
+        _schedule_auto_close(cb.bot, bridge, dispatcher)
+
+    # confirmation rides on the callback answer (outside the message
+    # rate limit); the invitation itself is removed in the background
+    await cb.answer("✅ You are now connected to admin.")
+    asyncio.create_task(_delete_quietly(cb.message))
 
     await cb.bot.send_message(
         chat_id=admin_id,
@@ -169,26 +280,31 @@ async def open_bridge(cb: CallbackQuery, state: FSMContext, dispatcher: Dispatch
         ),
     )
 
-    asyncio.create_task(
-        auto_close(cb.bot, admin_id, user_id, dispatcher)
-    )
-
 # ─────────────────────────────
 # /end_contact (admin)
 # ─────────────────────────────
 
-@router.message(Command("end_contact"), ContactState.bridge_active)
+# gated on the bridge map rather than the FSM: the admin may have started
+# another flow since, and the bridge must stay closable
+@router.message(Command("end_contact"))
 async def end_contact(message: Message, state: FSMContext, dispatcher: Dispatcher):
     if not is_admin(message.from_user.id):
         return
 
-    data = await state.get_data()
-    peer = data.get("peer")
-
     admin_id = message.from_user.id
 
     # ── clear admin side ──
-    await state.clear()
+    async with _bridge_lock:
+        bridge = _bridges.pop_by_a(admin_id)
+        in_bridge = await state.get_state() == ContactState.bridge_active.state
+        if in_bridge:
+            await state.clear()
+
+    if bridge is None and not in_bridge:
+        await message.answer("ℹ️ No active contact.")
+        return
+
+    peer = bridge.user_id if bridge else None
 
     if peer:
         # ── create peer FSM context correctly ──
@@ -200,7 +316,8 @@ async def end_contact(message: Message, state: FSMContext, dispatcher: Dispatche
                 user_id=peer,
             )
         )
-        await peer_ctx.clear()
+        if await peer_ctx.get_state() == ContactState.bridge_active.state:
+            await peer_ctx.clear()
 
         try:
             await message.bot.send_message(
@@ -214,52 +331,122 @@ async def end_contact(message: Message, state: FSMContext, dispatcher: Dispatche
 
 # ─────────────────────────────
 # Message relay (ACTIVE ONLY)
+# Keep this handler last in the module: it is the catch-all for bridged
+# chats. Commands are never forwarded to the peer and fall through to
+# their own handlers instead.
 # ─────────────────────────────
 
-@router.message(ContactState.bridge_active)
-async def relay(message: Message, state: FSMContext):
-    data = await state.get_data()
-    peer = data.get("peer")
-    if not peer:
-        return
-
-    await message.bot.forward_message(
-        chat_id=peer,
-        from_chat_id=message.chat.id,
-        message_id=message.message_id
-    )
+@router.message(
+    bridge_peer,
+    ContactState.bridge_active,
+    ~F.text.startswith("/"),
+)
+async def relay(message: Message, dispatcher: Dispatcher, peer: int):
+    # peer comes from the bridge map via bridge_peer; no FSM data read
+    # coalesce bursts per (sender chat, peer) into one forwardMessages call
+    key = (message.chat.id, peer)
+    pending = _relay_pending.get(key)
+    if pending is None:
+        pending = _relay_pending[key] = []
+        asyncio.create_task(_flush_relay(message.bot, *key, dispatcher))
+    pending.append(message.message_id)
+
+
+async def _flush_relay(bot, from_chat_id: int, peer: int, dispatcher: Dispatcher):
+    await asyncio.sleep(RELAY_BATCH_WINDOW)
+    message_ids = sorted(_relay_pending.pop((from_chat_id, peer), ()))
+
+    for i in range(0, len(message_ids), RELAY_BATCH_MAX):
+        chunk = message_ids[i:i + RELAY_BATCH_MAX]
+        try:
+            if len(chunk) == 1:
+                await bot.forward_message(
+                    chat_id=peer,
+                    from_chat_id=from_chat_id,
+                    message_id=chunk[0]
+                )
+            else:
+                await bot.forward_messages(
+                    chat_id=peer,
+                    from_chat_id=from_chat_id,
+                    message_ids=chunk
+                )
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            if isinstance(e, TelegramBadRequest) and "chat not found" not in str(e).lower():
+                # deleted during the batch window, not forwardable, ...:
+                # skip just this chunk, the bridge itself is fine
+                logger.warning("Relay of %s message(s) to %s failed: %s", len(chunk), peer, e)
+                continue
+            # peer blocked the bot or is gone: close instead of revalidating
+            # the bridge on every message
+            logger.warning("Relay to %s failed, closing bridge: %s", peer, e)
+            bridge = _bridges.get_by_a(peer) or _bridges.get_by_b(peer)
+            if bridge and await _force_close(bot, bridge, dispatcher):
+                try:
+                    await bot.send_message(
+                        from_chat_id,
+                        "⚠️ Contact closed: message could not be delivered."
+                    )
+                except Exception:
+                    pass
+            return
+        except Exception:
+            logger.exception("Failed to relay %s message(s) to %s", len(chunk), peer)
 
 
 # ─────────────────────────────
 # Auto-close timeout
 # ─────────────────────────────
 
+def _schedule_auto_close(bot, bridge: Bridge, dispatcher: Dispatcher):
+    # one TimerHandle per bridge instead of a coroutine parked for 24h
+    bridge.timer = asyncio.get_running_loop().call_later(
+        BRIDGE_TIMEOUT,
+        lambda: asyncio.create_task(
+            auto_close(bot, bridge.admin_id, bridge.user_id, dispatcher)
+        ),
+    )
+
+
 async def auto_close(bot, admin_id: int, user_id: int, dispatcher: Dispatcher):
-    await asyncio.sleep(BRIDGE_TIMEOUT)
+    bridge = _bridges.get_by_a(admin_id)
 
-    admin_ctx = FSMContext(
-        storage=dispatcher.storage,
-        key=StorageKey(
-            bot_id=bot.id,
-            chat_id=admin_id,
-            user_id=admin_id,
-        )
-    )
+    # bridge was closed or replaced in the meantime
+    if bridge is None or bridge.user_id != user_id:
+        return
 
-    user_ctx = FSMContext(
-        storage=dispatcher.storage,
-        key=StorageKey(
-            bot_id=bot.id,
-            chat_id=user_id,
-            user_id=user_id,
+    bridge.timer = None
+
+    if await _force_close(bot, bridge, dispatcher):
+        # different chats, so they go out together; one failing must not skip the other
+        await asyncio.gather(
+            bot.send_message(admin_id, "⏱ Contact auto-closed (timeout)."),
+            bot.send_message(user_id, "⏱ Contact expired."),
+            return_exceptions=True,
         )
-    )
 
-    if await admin_ctx.get_state() == ContactState.bridge_active:
-        await admin_ctx.clear()
-        await user_ctx.clear()
-        try:
-            await bot.send_message(admin_id, "⏱ Contact auto-closed (timeout).")
-            await bot.send_message(user_id, "⏱ Contact expired.")
-        except Exception:
-            pass
+
+async def _force_close(bot, bridge: Bridge, dispatcher: Dispatcher) -> bool:
+    """Drop the bridge and clear the FSM sides still in it; False if already closed."""
+    async with _bridge_lock:
+        if _bridges.get_by_a(bridge.admin_id) is not bridge:
+            return False
+
+        _bridges.pop_by_a(bridge.admin_id)
+        for uid in (bridge.admin_id, bridge.user_id):
+            ctx = FSMContext(
+                storage=dispatcher.storage,
+                key=StorageKey(
+                    bot_id=bot.id,
+                    chat_id=uid,
+                    user_id=uid,
+                )
+            )
+            # commands are not relayed, so a side may have moved on to
+            # another flow; leave that flow alone
+            if await ctx.get_state() == ContactState.bridge_active.state:
+                await ctx.clear()
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Contact closed admin=%s user=%s", bridge.admin_id, bridge.user_id)
+    return True
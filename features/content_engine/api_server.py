@@ -10,6 +10,7 @@ from aiohttp import web
 from database import DB_PATH
 
 from . import resource_processor, storage
+from .file_io import write_coalesced
 
 logger = logging.getLogger(__name__)
 
@@ -222,6 +223,14 @@ async def retry_resource(request: web.Request) -> web.Response:
     )
 
 
+async def _iter_part(part):
+    while True:
+        chunk = await part.read_chunk(size=1024 * 1024)
+        if not chunk:
+            return
+        yield chunk
+
+
 async def upload_resource(request: web.Request) -> web.Response:
     ok, error = _authorized(request)
     if not ok:
@@ -237,7 +246,6 @@ async def upload_resource(request: web.Request) -> web.Response:
     uploaded_path: Optional[Path] = None
     safe_name = ""
     mime_type = ""
-    downloaded = 0
 
     try:
         async for part in reader:
@@ -252,20 +260,14 @@ async def upload_resource(request: web.Request) -> web.Response:
                 uploaded_path = _resource_dir() / f"api_{uuid4().hex}_{safe_name}"
                 tmp_path = uploaded_path.with_suffix(uploaded_path.suffix + ".tmp")
                 with tmp_path.open("wb") as handle:
-                    while True:
-                        chunk = await part.read_chunk(size=1024 * 1024)
-                        if not chunk:
-                            break
-                        downloaded += len(chunk)
-                        if downloaded > max_bytes:
-                            handle.close()
-                            tmp_path.unlink(missing_ok=True)
-                            return _json(
-                                {"ok": False, "error": "file_too_large", "max_mb": max_bytes // 1024 // 1024},
-                                status=413,
-                                request=request,
-                            )
-                        handle.write(chunk)
+                    written = await write_coalesced(handle, _iter_part(part), max_bytes)
+                if written is None:
+                    tmp_path.unlink(missing_ok=True)
+                    return _json(
+                        {"ok": False, "error": "file_too_large", "max_mb": max_bytes // 1024 // 1024},
+                        status=413,
+                        request=request,
+                    )
                 tmp_path.replace(uploaded_path)
             else:
                 value = await part.text()
@@ -0,0 +1,31 @@
+import asyncio
+from typing import AsyncIterable, BinaryIO, Optional
+
+# network chunks are coalesced up to this size before each disk write
+WRITE_BATCH_BYTES = 1024 * 1024
+
+
+async def write_coalesced(handle: BinaryIO, chunks: AsyncIterable[bytes], max_bytes: int) -> Optional[int]:
+    """
+    Stream chunks into an open binary file, batching them into
+    WRITE_BATCH_BYTES writes that run in a worker thread so a slow volume
+    does not stall the event loop.
+
+    Returns the number of bytes written, or None as soon as the stream goes
+    past max_bytes (the caller discards the partial file).
+    """
+    total = 0
+    pending = bytearray()
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        total += len(chunk)
+        if total > max_bytes:
+            return None
+        pending += chunk
+        if len(pending) >= WRITE_BATCH_BYTES:
+            await asyncio.to_thread(handle.write, pending)
+            pending = bytearray()
+    if pending:
+        await asyncio.to_thread(handle.write, pending)
+    return total
@@ -15,10 +15,11 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, KeyboardButton, Message, ReplyKeyboardMarkup, ReplyKeyboardRemove
 
-from admins import ADMIN_IDS
+from admins import is_admin
 from database import DB_PATH
 
 from . import ai, book_resources, resource_processor, scheduler, storage
+from .file_io import write_coalesced
 from .html_format import sanitize_telegram_html
 
 logger = logging.getLogger(__name__)
@@ -54,10 +55,6 @@ STYLE_CATEGORIES = [
 ]
 
 
-def is_admin(user_id: Optional[int]) -> bool:
-    return user_id is not None and int(user_id) in {int(x) for x in ADMIN_IDS}
-
-
 def _resource_dir() -> Path:
     base = os.getenv("CONTENT_RESOURCE_DIR")
     if base:
@@ -197,20 +194,14 @@ async def _download_resource_link(url: str, state: FSMContext) -> tuple[bool, st
                         pass
 
                 mime = (response.headers.get("Content-Type") or "").split(";", 1)[0].strip()
-                downloaded = 0
                 with tmp_path.open("wb") as handle:
-                    async for chunk in response.content.iter_chunked(1024 * 1024):
-                        if not chunk:
-                            continue
-                        downloaded += len(chunk)
-                        if downloaded > max_bytes:
-                            handle.close()
-                            tmp_path.unlink(missing_ok=True)
-                            return False, (
-                                f"This file is larger than the configured limit "
-                                f"({max_bytes // 1024 // 1024} MB)."
-                            )
-                        handle.write(chunk)
+                    written = await write_coalesced(handle, response.content.iter_chunked(1024 * 1024), max_bytes)
+                if written is None:
+                    tmp_path.unlink(missing_ok=True)
+                    return False, (
+                        f"This file is larger than the configured limit "
+                        f"({max_bytes // 1024 // 1024} MB)."
+                    )
     except aiohttp.ClientError as exc:
         tmp_path.unlink(missing_ok=True)
         logger.warning("Resource link download failed: %s", exc)
@@ -17,7 +17,7 @@ from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
 
-from admins import ADMIN_IDS
+from admins import is_admin
 from database import (
     get_command_usage_stats,
     get_total_book_request_stats,
@@ -30,19 +30,11 @@ router = Router()
 # CONFIG
 # ─────────────────────────────
 
-COUNTED_COMMANDS = {
+COUNTED_COMMANDS = frozenset({
     "start",
     "all_books",
     # add more commands explicitly if needed
-}
-
-
-# ─────────────────────────────
-# Utils
-# ─────────────────────────────
-
-def is_admin(user_id: int | None) -> bool:
-    return user_id is not None and int(user_id) in set(map(int, ADMIN_IDS))
+})
 
 
 # ─────────────────────────────
@@ -62,7 +54,7 @@ async def count_uses_handler(message: Message):
     lines.append("📊 *Usage statistics*\n")
 
     # ───────── Commands ─────────
-    stats = get_command_usage_stats()
+    stats = get_command_usage_stats(COUNTED_COMMANDS)
 
     today_commands_total = 0
     lifetime_commands_total = 0
@@ -71,12 +63,10 @@ async def count_uses_handler(message: Message):
 
     if stats:
         for command, last_24h, total in stats:
-            if command not in COUNTED_COMMANDS:
-                continue
-
             lines.append(f"/{command} — {last_24h} / {total}")
-            today_commands_total += int(last_24h or 0)
-            lifetime_commands_total += int(total or 0)
+            # sqlite3 already returns ints for SUM/COUNT
+            today_commands_total += last_24h or 0
+            lifetime_commands_total += total or 0
     else:
         lines.append("yo‘q")
 
@@ -18,23 +18,24 @@ DB is the single source of truth.
 FSM = control, not storage.
 """
 
+import asyncio
+import itertools
+import re
 import time
 import logging
 from typing import Optional
 
 from aiogram import Router, F
 from aiogram.types import Message
-from aiogram.filters import Command
+from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-import admins
+from admins import is_admin
 from database import (
     save_test_definition,
     get_test_definition,
-    get_all_test_definitions,
     save_test_question,
-    ensure_test_questions_table,
 )
 
 logger = logging.getLogger(__name__)
@@ -42,6 +43,31 @@ router = Router()
 
 MODE = "create_test"
 
+# exactly four "<a-d> - <text>" lines; blank lines between them are allowed
+_ANSWER_LINE = r"\s*([abcd])[ \t]*-([^\n]*)"
+ANSWERS_RE = re.compile(r"\n".join([_ANSWER_LINE] * 4) + r"\s*", re.IGNORECASE)
+LEVEL_RE = re.compile(r"(?:A2|B1|B2|C1)", re.IGNORECASE)
+_VALID_CORRECT = frozenset("abcdABCD")
+
+# router-level gates, built once and shared by every handler
+CMD_CREATE = Command("create_test")
+CMD_EDIT_Q = Command("edit_q")
+CMD_EDIT_T = Command("edit_t")
+CMD_CANCEL = Command("cancel")
+NOT_COMMAND = ~F.text.startswith("/")
+# bounds are still checked in the handler
+NUMBER = F.text.regexp(r"^[0-9]{1,5}$")
+
+MAX_TIME_LIMIT = 600     # minutes
+MAX_QUESTIONS = 500
+
+# fixed replies, built once
+PROMPT_START = "🧪 Creating new test\n\nSend test NAME\n/cancel — exit"
+PROMPT_ANSWERS = "Send answers:\na - ...\nb - ...\nc - ...\nd - ..."
+PROMPT_CORRECT = "Send CORRECT answer (a/b/c/d)"
+ERR_TIME = f"❗ Send a number (1–{MAX_TIME_LIMIT})."
+ERR_COUNT = f"❗ Send a number (1–{MAX_QUESTIONS})."
+
 
 # ─────────────────────────────
 # FSM STATES
@@ -61,30 +87,82 @@ class CreateTest(StatesGroup):
 # HELPERS
 # ─────────────────────────────
 
-def is_admin(uid: int) -> bool:
-    return uid in {int(x) for x in getattr(admins, "ADMIN_IDS", [])}
+def from_admin(message: Message) -> bool:
+    return message.from_user is not None and is_admin(message.from_user.id)
+
+
+# Step handlers only ever see admins (only admins can enter CreateTest), so
+# they sit behind one router-level check and non-admin updates skip them all.
+# Entry commands stay on `router` to keep answering non-admins.
+steps = Router()
+steps.message.filter(from_admin)
+router.include_router(steps)
+
+
+# seeded from the clock in ms so ids keep growing across restarts,
+# but never repeat within a process even when two admins start at once
+_test_seq = itertools.count(time.time_ns() // 1_000_000)
+_B36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _base36(n: int) -> str:
+    out = []
+    while n:
+        n, r = divmod(n, 36)
+        out.append(_B36[r])
+    return "".join(reversed(out)) or "0"
 
 
 def gen_test_id() -> str:
-    return f"test_{int(time.time())}"
+    return f"test_{_base36(next(_test_seq))}"
 
 
-def parse_answers(text: str) -> Optional[dict]:
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    if len(lines) != 4:
+def parse_answers(text: str) -> Optional[tuple]:
+    """Return the answers as (a, b, c, d), whatever order they were sent in."""
+    m = ANSWERS_RE.fullmatch(text)
+    if not m:
         return None
 
-    out = {}
-    for l in lines:
-        if "-" not in l:
-            return None
-        k, v = l.split("-", 1)
-        k = k.strip().lower()
-        if k not in ("a", "b", "c", "d"):
-            return None
-        out[k] = v.strip()
+    g = m.groups()
+    out = {g[i].lower(): g[i + 1].strip() for i in range(0, 8, 2)}
+    if len(out) != 4:
+        return None
+    return out["a"], out["b"], out["c"], out["d"]
 
-    return out if len(out) == 4 else None
+
+def parse_level(text: str) -> Optional[str]:
+    t = text.strip()
+    return t.upper() if LEVEL_RE.fullmatch(t) else None
+
+
+def parse_pos_int(text: str, lo: int = 1, hi: int = 10_000) -> Optional[int]:
+    t = text.strip()
+    # isascii() keeps "²" & co. out, so int() below cannot raise
+    if not (t.isascii() and t.isdigit()):
+        return None
+    n = int(t)
+    return n if lo <= n <= hi else None
+
+
+def parse_time_limit(text: str) -> Optional[int]:
+    return parse_pos_int(text, hi=MAX_TIME_LIMIT)
+
+
+async def advance(state: FSMContext, next_state: State, snapshot: Optional[dict] = None, **data):
+    """
+    Store step data and switch state; they live under separate storage keys.
+    Pass the dict from an earlier get_data() as `snapshot` to write it back
+    whole instead of letting update_data() read the blob again.
+    """
+    if snapshot is not None:
+        snapshot.update(data)
+        write = state.set_data(snapshot)
+    elif data:
+        write = state.update_data(**data)
+    else:
+        await state.set_state(next_state)
+        return
+    await asyncio.gather(write, state.set_state(next_state))
 
 
 async def abort(uid: int, state: FSMContext, reason: str):
@@ -101,7 +179,7 @@ async def ensure_free_or_same(state: FSMContext) -> bool:
 # ENTRY
 # ─────────────────────────────
 
-@router.message(Command("create_test"))
+@router.message(CMD_CREATE)
 async def start(message: Message, state: FSMContext):
     uid = message.from_user.id
 
@@ -113,70 +191,71 @@ async def start(message: Message, state: FSMContext):
         await message.answer("⏳ Finish current process first.")
         return
 
-    await state.clear()
-
-    await state.update_data(
+    await advance(
+        state, CreateTest.name, {},
         test_id=gen_test_id(),
         q_current=1,
         edit_return=None,
     )
-
-    await state.set_state(CreateTest.name)
-    await message.answer(
-        "🧪 Creating new test\n\n"
-        "Send test NAME\n"
-        "/cancel — exit"
-    )
+    await message.answer(PROMPT_START)
 
 
 # ─────────────────────────────
 # META
 # ─────────────────────────────
 
-@router.message(CreateTest.name, ~F.text.startswith("/"))
-async def name_step(message: Message, state: FSMContext):
-    await state.update_data(name=message.text.strip())
-    await state.set_state(CreateTest.level)
-    await message.answer("Send LEVEL (A2 / B1 / B2 / C1)")
-
-
-@router.message(CreateTest.level, ~F.text.startswith("/"))
-async def level_step(message: Message, state: FSMContext):
-    await state.update_data(level=message.text.strip())
-    await state.set_state(CreateTest.time)
-    await message.answer("Send TIME LIMIT (minutes)")
-
-
-@router.message(CreateTest.time, ~F.text.startswith("/"))
-async def time_step(message: Message, state: FSMContext):
-    if not message.text.isdigit():
-        await message.answer("❗ Send a number.")
+# state → (data key, parser, error, next state, next prompt); parser returns None on bad input
+META_STEPS = {
+    CreateTest.name.state: (
+        "name", str.strip, None,
+        CreateTest.level, "Send LEVEL (A2 / B1 / B2 / C1)",
+    ),
+    CreateTest.level.state: (
+        "level", parse_level, "❗ Level must be A2 / B1 / B2 / C1.",
+        CreateTest.time, "Send TIME LIMIT (minutes)",
+    ),
+    CreateTest.time.state: (
+        "time_limit", parse_time_limit, ERR_TIME,
+        CreateTest.count, "Send NUMBER OF QUESTIONS",
+    ),
+}
+
+
+@steps.message(StateFilter(CreateTest.name, CreateTest.level), NOT_COMMAND)
+@steps.message(CreateTest.time, NUMBER)
+async def meta_step(message: Message, state: FSMContext, raw_state: str):
+    key, parse, error, next_state, prompt = META_STEPS[raw_state]
+
+    value = parse(message.text)
+    if value is None:
+        await message.answer(error)
         return
 
-    await state.update_data(time_limit=int(message.text))
-    await state.set_state(CreateTest.count)
-    await message.answer("Send NUMBER OF QUESTIONS")
+    await advance(state, next_state, **{key: value})
+    await message.answer(prompt)
 
 
-@router.message(CreateTest.count, ~F.text.startswith("/"))
+@steps.message(CreateTest.count, NUMBER)
 async def count_step(message: Message, state: FSMContext):
-    if not message.text.isdigit():
-        await message.answer("❗ Send a number.")
+    q_count = parse_pos_int(message.text, hi=MAX_QUESTIONS)
+    if q_count is None:
+        await message.answer(ERR_COUNT)
         return
 
     data = await state.get_data()
-    q_count = int(message.text)
 
-    save_test_definition(
+    # the definition lives in the DB from here on; only loop state stays in FSM
+    meta = {k: data.pop(k) for k in ("name", "level", "time_limit")}
+
+    # sqlite calls run off the event loop
+    await asyncio.to_thread(
+        save_test_definition,
         test_id=data["test_id"],
-        name=data["name"],
-        level=data["level"],
         question_count=q_count,
-        time_limit=data["time_limit"],
+        **meta,
     )
 
-    await state.update_data(question_count=q_count)
-    await state.set_state(CreateTest.question)
+    await advance(state, CreateTest.question, data, question_count=q_count)
 
     await message.answer(
         f"✅ Test created.\n\n"
@@ -185,53 +264,56 @@ async def count_step(message: Message, state: FSMContext):
     )
 
 
+@steps.message(StateFilter(CreateTest.time, CreateTest.count), NOT_COMMAND)
+async def not_a_number(message: Message):
+    await message.answer("❗ Send a number.")
+
+
 # ─────────────────────────────
 # QUESTIONS
 # ─────────────────────────────
 
-@router.message(CreateTest.question, ~F.text.startswith("/"))
+@steps.message(CreateTest.question, NOT_COMMAND)
 async def question_step(message: Message, state: FSMContext):
-    await state.update_data(question_text=message.text.strip())
-    await state.set_state(CreateTest.answers)
+    await advance(state, CreateTest.answers, question_text=message.text.strip())
 
-    await message.answer(
-        "Send answers:\n"
-        "a - ...\n"
-        "b - ...\n"
-        "c - ...\n"
-        "d - ..."
-    )
+    await message.answer(PROMPT_ANSWERS)
 
 
-@router.message(CreateTest.answers, ~F.text.startswith("/"))
+@steps.message(CreateTest.answers, NOT_COMMAND)
 async def answers_step(message: Message, state: FSMContext):
     parsed = parse_answers(message.text)
     if not parsed:
         await message.answer("❗ Invalid format.")
         return
 
-    await state.update_data(answers=parsed)
-    await state.set_state(CreateTest.correct)
-    await message.answer("Send CORRECT answer (a/b/c/d)")
+    await advance(state, CreateTest.correct, answers=parsed)
+    await message.answer(PROMPT_CORRECT)
 
 
-@router.message(CreateTest.correct, ~F.text.startswith("/"))
+@steps.message(CreateTest.correct, NOT_COMMAND)
 async def correct_step(message: Message, state: FSMContext):
-    correct = message.text.lower().strip()
-    if correct not in ("a", "b", "c", "d"):
+    t = message.text.strip()
+    if len(t) != 1 or t not in _VALID_CORRECT:
         await message.answer("❗ Must be a/b/c/d.")
         return
+    correct = t.lower()
 
     data = await state.get_data()
     qn = data["q_current"]
 
-    save_test_question(
+    # upserted as soon as it is complete, so /cancel, /edit_t or a restart
+    # never lose finished questions (and /edit_q replaces the row in place)
+    if not await asyncio.to_thread(
+        save_test_question,
         test_id=data["test_id"],
         question_number=qn,
         question_text=data["question_text"],
         answers=data["answers"],
         correct_answer=correct,
-    )
+    ):
+        await message.answer("❌ Could not save the question. Send the correct answer again to retry.")
+        return
 
     total = data["question_count"]
     next_q = qn + 1
@@ -241,8 +323,9 @@ async def correct_step(message: Message, state: FSMContext):
         await message.answer("🎉 All questions created. Test is READY.")
         return
 
-    await state.update_data(q_current=next_q)
-    await state.set_state(CreateTest.question)
+    # saved above, no need to carry them into the next question
+    del data["question_text"], data["answers"]
+    await advance(state, CreateTest.question, data, q_current=next_q)
     await message.answer(f"✍️ Question {next_q} / {total}")
 
 
@@ -250,10 +333,8 @@ async def correct_step(message: Message, state: FSMContext):
 # EDIT QUESTION
 # ─────────────────────────────
 
-@router.message(Command("edit_q"))
+@router.message(CMD_EDIT_Q)
 async def edit_question(message: Message, state: FSMContext):
-    data = await state.get_data()
-
     if await state.get_state() is None:
         await message.answer("❗ You are not editing a test.")
         return
@@ -263,6 +344,7 @@ async def edit_question(message: Message, state: FSMContext):
         await message.answer("Usage: /edit_q <number>")
         return
 
+    data = await state.get_data()
     qn = int(parts[1])
     total = data.get("question_count")
 
@@ -270,11 +352,11 @@ async def edit_question(message: Message, state: FSMContext):
         await message.answer("❌ Invalid question number.")
         return
 
-    await state.update_data(
+    await advance(
+        state, CreateTest.question, data,
         edit_return=data["q_current"],
         q_current=qn,
     )
-    await state.set_state(CreateTest.question)
     await message.answer(f"✍️ Editing question {qn} / {total}")
 
 
@@ -282,7 +364,7 @@ async def edit_question(message: Message, state: FSMContext):
 # EDIT TEST (LOAD)
 # ─────────────────────────────
 
-@router.message(Command("edit_t"))
+@router.message(CMD_EDIT_T)
 async def edit_test(message: Message, state: FSMContext):
     uid = message.from_user.id
     if not is_admin(uid):
@@ -294,24 +376,20 @@ async def edit_test(message: Message, state: FSMContext):
         await message.answer("Usage: /edit_t <test_id>")
         return
 
-    test = get_test_definition(parts[1])
+    test = await asyncio.to_thread(get_test_definition, parts[1])
     if not test:
         await message.answer("❌ Test not found.")
         return
 
-    test_id, name, level, q_count, time_limit, _ = test
+    test_id, q_count = test[0], test[3]
 
-    await state.clear()
-    await state.update_data(
+    await advance(
+        state, CreateTest.question, {},
         test_id=test_id,
-        name=name,
-        level=level,
         question_count=q_count,
-        time_limit=time_limit,
         q_current=1,
         edit_return=None,
     )
-    await state.set_state(CreateTest.question)
     await message.answer(f"✍️ Editing test {test_id}\nQuestion 1 / {q_count}")
 
 
@@ -319,11 +397,14 @@ async def edit_test(message: Message, state: FSMContext):
 # CANCEL
 # ─────────────────────────────
 
-@router.message(Command("cancel"))
+# scoped to our states so other features' /cancel handlers are not shadowed
+@steps.message(CMD_CANCEL, StateFilter(CreateTest))
 async def cancel(message: Message, state: FSMContext):
-    if await state.get_state() is None:
-        return
-
     await abort(message.from_user.id, state, "create_test cancelled")
     await message.answer("🛑 Test creation cancelled.")
 
+
+@router.message(CMD_CANCEL, StateFilter(None))
+async def cancel_idle(message: Message):
+    await message.answer("ℹ️ Nothing to cancel.")
+
@@ -12,7 +12,7 @@ Router-based, async, FSM-safe.
 import asyncio
 import logging
 import time
-import random
+import secrets
 import string
 import sqlite3
 import os
@@ -23,7 +23,7 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKe
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
-import admins
+from admins import is_admin as _is_admin
 from features.sub_check import require_subscription
 from database import (
     get_active_test,
@@ -42,6 +42,11 @@ router = Router()
 TEST_MODE = "in_test"
 EXTRA_GRACE_SECONDS = 0
 
+# callback_data prefixes, shared by the keyboard builder and the filters
+ANSWER_PREFIX = "ans|"
+PREV_PREFIX = "prev|"
+NEXT_PREFIX = "next|"
+
 DB_PATH = os.getenv("DB_PATH", os.getenv("SQLITE_PATH", "/data/data.db"))
 SQLITE_TIMEOUT = 5
 
@@ -122,8 +127,16 @@ def _clear_previous_attempt(user_id: int, test_id: str):
 # Helpers
 # ─────────────────────────────
 
+_TOKEN_ALPHABET = string.ascii_uppercase + string.digits
+
 def _gen_token(length=7):
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    # One CSPRNG draw, spelled out in base 36 (same alphabet and length as before).
+    n = secrets.randbelow(36 ** length)
+    out = []
+    for _ in range(length):
+        n, r = divmod(n, 36)
+        out.append(_TOKEN_ALPHABET[r])
+    return "".join(out)
 
 def _format_timer(seconds: int) -> str:
     m, s = divmod(max(0, seconds), 60)
@@ -245,7 +258,7 @@ async def start_test_entry(query: CallbackQuery, state: FSMContext):
 
     set_user_mode(user_id, TEST_MODE)
 
-    is_admin = user_id in getattr(admins, "ADMIN_IDS", set())
+    is_admin = _is_admin(user_id)
 
     if is_admin:
         set_user_name(user_id, None)
@@ -264,13 +277,8 @@ async def start_test_entry(query: CallbackQuery, state: FSMContext):
 
 @router.message(F.text & ~F.text.startswith("/") & (F.func(lambda m: get_user_mode(m.from_user.id) == TEST_MODE)))
 async def capture_name(message: Message, state: FSMContext):
+    # text / not-a-command / TEST_MODE are all checked by the filter above
     user = message.from_user
-    if not user or get_user_mode(user.id) != TEST_MODE:
-        return
-
-    # 👇 THIS is the real guard
-    #if get_user_mode(user.id) != TEST_MODE:
-    #    return
 
     data = await state.get_data()
     if not data.get("awaiting_name"):
@@ -304,11 +312,12 @@ async def _start_test_core(chat_id: int, state: FSMContext, user_id: int, bot):
 
     token, finished = _get_existing_token(user_id, test_id)
 
-    if user_id in getattr(admins, "ADMIN_IDS", set()):
+    admin = _is_admin(user_id)
+    if admin:
         _clear_previous_attempt(user_id, test_id)
         token, finished = None, False
 
-    if token and finished and user_id not in getattr(admins, "ADMIN_IDS", set()):
+    if token and finished and not admin:
         await bot.send_message(
             chat_id,
             f"❌ You already passed this test.\n\n🔑 Your token: <code>{token}</code>\n📊 Send /result to see your result.",
@@ -392,16 +401,16 @@ async def _render_question(state: FSMContext, bot):
     buttons = []
     if idx not in data["answers"]:
         buttons.extend([
-            [InlineKeyboardButton(text=a, callback_data=f"ans|{idx}|a")],
-            [InlineKeyboardButton(text=b, callback_data=f"ans|{idx}|b")],
-            [InlineKeyboardButton(text=c, callback_data=f"ans|{idx}|c")],
-            [InlineKeyboardButton(text=d, callback_data=f"ans|{idx}|d")],
+            [InlineKeyboardButton(text=a, callback_data=f"{ANSWER_PREFIX}{idx}|a")],
+            [InlineKeyboardButton(text=b, callback_data=f"{ANSWER_PREFIX}{idx}|b")],
+            [InlineKeyboardButton(text=c, callback_data=f"{ANSWER_PREFIX}{idx}|c")],
+            [InlineKeyboardButton(text=d, callback_data=f"{ANSWER_PREFIX}{idx}|d")],
         ])
 
     buttons.append([
-        InlineKeyboardButton(text="⬅️ Prev", callback_data=f"prev|{idx}"),
+        InlineKeyboardButton(text="⬅️ Prev", callback_data=f"{PREV_PREFIX}{idx}"),
         InlineKeyboardButton(text=f"{idx + 1}/{len(data['questions'])}", callback_data="noop"),
-        InlineKeyboardButton(text="Next ➡️", callback_data=f"next|{idx}"),
+        InlineKeyboardButton(text="Next ➡️", callback_data=f"{NEXT_PREFIX}{idx}"),
     ])
     buttons.append([InlineKeyboardButton(text="🏁 Finish", callback_data="finish")])
 
@@ -430,7 +439,7 @@ async def _render_question(state: FSMContext, bot):
 # Callbacks
 # ─────────────────────────────
 
-@router.callback_query(F.data.startswith("ans|"))
+@router.callback_query(F.data.startswith(ANSWER_PREFIX))
 async def answer_handler(query: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     if data.get("finished"):
@@ -440,7 +449,8 @@ async def answer_handler(query: CallbackQuery, state: FSMContext):
     await query.answer("Noted ✅")
 
     idx = (await state.get_data())["index"]
-    _, _, choice = query.data.split("|")
+    # ans|<idx>|<choice>: the choice is everything after the last separator
+    choice = query.data.rpartition("|")[2]
 
     data["answers"][idx] = choice
     data["skipped"].discard(idx)
@@ -454,7 +464,7 @@ async def answer_handler(query: CallbackQuery, state: FSMContext):
     await state.update_data(**data)
     await _render_question(state, query.bot)
 
-@router.callback_query(F.data.startswith("prev|"))
+@router.callback_query(F.data.startswith(PREV_PREFIX))
 async def prev_handler(query: CallbackQuery, state: FSMContext):
     await query.answer()
     data = await state.get_data()
@@ -471,7 +481,7 @@ async def prev_handler(query: CallbackQuery, state: FSMContext):
         await _render_question(state, query.bot)
 
 
-@router.callback_query(F.data.startswith("next|"))
+@router.callback_query(F.data.startswith(NEXT_PREFIX))
 async def next_handler(query: CallbackQuery, state: FSMContext):
     await query.answer()
     data = await state.get_data()
@@ -554,7 +564,7 @@ async def _finish(state: FSMContext, manual: bool, bot):
     correct = sum(1 for idx, selected in data["answers"].items() if correct_map.get(idx) == selected)
     score = round((correct / total) * 100, 2)
 
-    save_test_score(
+    saved = save_test_score(
         token=data["token"],
         test_id=data["context_test_id"],
         user_id=data["user_id"],
@@ -564,7 +574,11 @@ async def _finish(state: FSMContext, manual: bool, bot):
         max_score=100,
         time_left=data["time_left"],
         auto_finished=data["auto_finished"],
+        clear_mode=True,
     )
+    if not saved:
+        # the score write rolled back; still release the user
+        clear_user_mode(data["user_id"])
 
     
     for key in ("timer_msg_id", "question_msg_id"):
@@ -580,5 +594,4 @@ async def _finish(state: FSMContext, manual: bool, bot):
         f"To see your result, send:\n/result {data['token']}",
     )
 
-    clear_user_mode(data["user_id"])
     await state.clear()
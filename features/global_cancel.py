@@ -10,7 +10,6 @@ WARNING:
 """
 
 import logging
-from typing import Optional
 
 from aiogram import Router
 from aiogram.filters import Command
@@ -19,21 +18,13 @@ from aiogram.fsm.context import FSMContext
 
 from database import clear_all_user_modes
 #from global_cleaner import clean_user
-import admins
+from admins import is_admin as _is_admin
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
 
-# ─────────────────────────────
-# Helpers
-# ─────────────────────────────
-
-def _is_admin(user_id: Optional[int]) -> bool:
-    raw = getattr(admins, "ADMIN_IDS", []) or []
-    return user_id is not None and int(user_id) in {int(x) for x in raw}
-
 # ─────────────────────────────
 # /cancel_all — ADMIN ONLY
 # ─────────────────────────────
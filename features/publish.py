@@ -14,7 +14,7 @@ from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
 
-import admins
+from admins import is_admin as _is_admin
 from database import (
     get_test_definition,
     has_active_test,
@@ -32,11 +32,6 @@ router = Router()
 # Helpers
 # ─────────────────────────────
 
-def _is_admin(user_id: Optional[int]) -> bool:
-    raw = getattr(admins, "ADMIN_IDS", []) or []
-    return user_id is not None and int(user_id) in {int(x) for x in raw}
-
-
 def _parse_test_id(text: str) -> Optional[str]:
     parts = text.split(maxsplit=1)
     if len(parts) != 2:
@@ -1,5 +1,5 @@
 # features/referral.py
-from aiogram import Router, Bot
+from aiogram import Router, Bot, F
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters import Command, CommandStart
 from aiogram.types import CallbackQuery
@@ -11,7 +11,7 @@ from database import (
     mark_referral_confirmed,
     recheck_all_referrals, 
 )
-from aiogram.filters import CommandStart, Filter
+from aiogram.filters import CommandObject
 
 router = Router()
 
@@ -75,16 +75,10 @@ async def referral_screen(message: Message, bot: Bot):
 
 
 # ---------- /start with referral ----------
-class RefDeepLink(Filter):
-    async def __call__(self, message: Message) -> bool:
-        parts = message.text.split(maxsplit=1)
-        return len(parts) > 1 and parts[1].startswith("ref_")
-
-@router.message(CommandStart(deep_link=True), RefDeepLink())
-async def start_with_referral(message: Message, bot: Bot):
+@router.message(CommandStart(deep_link=True, magic=F.args.startswith("ref_")))
+async def start_with_referral(message: Message, bot: Bot, command: CommandObject):
     user_id = message.from_user.id
-    payload = message.text.split(maxsplit=1)
-    ref_code = payload[1]
+    ref_code = command.args
 
     add_user_if_new(
         user_id,
@@ -14,7 +14,7 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 
-import admins
+from admins import is_admin as _is_admin
 from database import delete_user
 
 logger = logging.getLogger(__name__)
@@ -22,17 +22,6 @@ logger = logging.getLogger(__name__)
 router = Router()
 
 
-# ─────────────────────────────
-# Helpers
-# ─────────────────────────────
-
-def _is_admin(user_id: int | None) -> bool:
-    if user_id is None:
-        return False
-    raw = getattr(admins, "ADMIN_IDS", []) or []
-    return int(user_id) in {int(x) for x in raw}
-
-
 # ─────────────────────────────
 # /rem_fr_db <user_id>
 # ─────────────────────────────
@@ -21,7 +21,7 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 
-import admins
+from admins import is_admin as _is_admin
 from database import get_active_test, get_checker_mode
 
 logger = logging.getLogger(__name__)
@@ -39,11 +39,6 @@ def _connect():
     return sqlite3.connect(DB_PATH, timeout=SQLITE_TIMEOUT, check_same_thread=False)
 
 
-def _is_admin(user_id: int) -> bool:
-    raw = getattr(admins, "ADMIN_IDS", []) or []
-    return int(user_id) in {int(x) for x in raw}
-
-
 # ─────────────────────────────
 # /reopen_test (admin)
 # ─────────────────────────────
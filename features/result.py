@@ -21,7 +21,7 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 from features.sub_check import is_subscribed
-import admins
+from admins import is_admin as _is_admin
 from database import (
     get_active_test,
     get_checker_mode,
@@ -74,11 +74,6 @@ def _split_text_for_telegram(text: str, limit: int = MAX_TELEGRAM_LEN):
 # Helpers (READ-ONLY SQL)
 # ─────────────────────────────
 
-def _is_admin(user_id: int) -> bool:
-    raw = getattr(admins, "ADMIN_IDS", []) or []
-    return int(user_id) in {int(x) for x in raw}
-
-
 def _get_latest_score_for_user_in_active_test(user_id: int, test_id: str):
     conn = sqlite3.connect(DB_PATH, timeout=SQLITE_TIMEOUT, check_same_thread=False)
     cur = conn.execute(
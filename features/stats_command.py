@@ -10,14 +10,13 @@ Feature: /stats admin-only command (Aiogram 3).
 import os
 import sqlite3
 import logging
-from typing import Set
 
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 
-import admins
+from admins import is_admin
 
 logger = logging.getLogger(__name__)
 
@@ -30,17 +29,6 @@ DB_PATH = os.getenv("DB_PATH", os.getenv("SQLITE_PATH", "/data/data.db"))
 # Helpers
 # ─────────────────────────────
 
-def _get_admin_ids() -> Set[int]:
-    ids: Set[int] = set()
-    raw = getattr(admins, "ADMIN_IDS", []) or []
-    for v in raw:
-        try:
-            ids.add(int(v))
-        except Exception:
-            logger.warning("Ignoring non-int admin id: %r", v)
-    return ids
-
-
 def _count_users() -> int:
     if not os.path.exists(DB_PATH):
         return 0
@@ -69,8 +57,7 @@ async def stats_handler(message: Message, state: FSMContext):
     if not user:
         return
 
-    admin_ids = _get_admin_ids()
-    if user.id not in admin_ids:
+    if not is_admin(user.id):
         logger.info("Non-admin %s tried /stats", user.id)
         return
 
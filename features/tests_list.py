@@ -13,17 +13,13 @@ from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
 
-import admins
+from admins import is_admin
 from database import get_all_test_definitions
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 
-def is_admin(user_id: int) -> bool:
-    return user_id in {int(x) for x in getattr(admins, "ADMIN_IDS", [])}
-
-
 def fmt_ts(ts: int) -> str:
     try:
         return time.strftime("%Y-%m-%d %H:%M", time.localtime(int(ts)))
@@ -1,5 +1,6 @@
 import html
 import logging
+import re
 import time
 from datetime import datetime, timezone
 
@@ -37,6 +38,7 @@ class VCoinBuyState(StatesGroup):
 
 
 BUY_MODE_TIMEOUT_SECONDS = 30 * 60
+VCOIN_CALLBACK_RE = re.compile(r"^vcoin_(confirm|reject|admin):(.*)$", re.DOTALL)
 CANCEL_TEXT = "Cancel"
 
 
@@ -488,25 +490,18 @@ async def receipt_without_package(message: Message):
     await message.answer("Please create a V-Coin payment from the website wallet first.")
 
 
-@router.callback_query(F.data.startswith("vcoin_confirm:"))
-async def admin_confirm_vcoin(cb: CallbackQuery):
-    payment_id = cb.data.split(":", 1)[1]
-    await _admin_payment_action(cb, payment_id, "confirm")
-
-
-@router.callback_query(F.data.startswith("vcoin_reject:"))
-async def admin_reject_vcoin(cb: CallbackQuery):
-    payment_id = cb.data.split(":", 1)[1]
-    await _admin_payment_action(cb, payment_id, "reject")
-
-
-@router.callback_query(F.data.startswith("vcoin_admin:"))
-async def admin_vcoin_action(cb: CallbackQuery):
-    parts = cb.data.split(":", 2)
-    if len(parts) != 3:
-        await cb.answer("Old or invalid button.", show_alert=True)
-        return
-    await _admin_payment_action(cb, parts[2], parts[1])
+@router.callback_query(F.data.regexp(VCOIN_CALLBACK_RE).as_("match"))
+async def admin_vcoin_action(cb: CallbackQuery, match: re.Match):
+    # current buttons: vcoin_admin:<action>:<id>; legacy: vcoin_<action>:<id>
+    kind, rest = match.groups()
+    if kind == "admin":
+        action, sep, payment_id = rest.partition(":")
+        if not sep:
+            await cb.answer("Old or invalid button.", show_alert=True)
+            return
+    else:
+        action, payment_id = kind, rest
+    await _admin_payment_action(cb, payment_id, action)
 
 
 async def _admin_payment_action(cb: CallbackQuery, payment_id: str, action: str):
@@ -19,7 +19,7 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 
-import admins
+from admins import is_admin as _is_admin
 from database import get_checker_mode
 
 logger = logging.getLogger(__name__)
@@ -35,17 +35,13 @@ MAX_TELEGRAM_LEN = 4000
 # Helpers
 # ─────────────────────────────
 
-def _is_admin(user_id: int) -> bool:
-    raw = getattr(admins, "ADMIN_IDS", []) or []
-    return user_id is not None and int(user_id) in {int(x) for x in raw}
-
-
-def _split_text_for_telegram(text: str, limit: int = MAX_TELEGRAM_LEN):
+def _split_lines_for_telegram(lines, limit: int = MAX_TELEGRAM_LEN):
+    # Packs the already-built lines directly (no join + re-split round trip).
     chunks = []
     current = []
     size = 0
 
-    for line in text.split("\n"):
+    for line in lines:
         ln = len(line) + 1
         if size + ln > limit:
             chunks.append("\n".join(current))
@@ -86,14 +82,19 @@ async def wat_handler(message: Message, state: FSMContext):
         conn = sqlite3.connect(DB_PATH, timeout=SQLITE_TIMEOUT, check_same_thread=False)
         cur = conn.cursor()
 
-        # 1️⃣ Get ALL tables
+        # 1️⃣ Get ALL tables together with their schema (one query)
         cur.execute("""
-            SELECT name FROM sqlite_master
-            WHERE type='table'
-              AND name NOT LIKE 'sqlite_%'
-            ORDER BY name;
+            SELECT m.name, p.name, p.type, p."notnull", p.pk
+            FROM sqlite_master AS m
+            JOIN pragma_table_info(m.name) AS p
+            WHERE m.type='table'
+              AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, p.cid;
         """)
-        tables = [r[0] for r in cur.fetchall()]
+        schema = {}
+        for table, name, col_type, notnull, pk in cur.fetchall():
+            schema.setdefault(table, []).append((name, col_type, notnull, pk))
+        tables = list(schema)
 
         if not tables:
             await message.answer("❌ No tables found in database.")
@@ -110,10 +111,8 @@ async def wat_handler(message: Message, state: FSMContext):
             lines.append(f"📋 <b>Table:</b> <code>{table}</code>")
 
             # Schema
-            cur.execute(f"PRAGMA table_info({table});")
-            cols = cur.fetchall()
             lines.append("📐 Columns:")
-            for cid, name, col_type, notnull, default, pk in cols:
+            for name, col_type, notnull, pk in schema[table]:
                 flags = []
                 if pk:
                     flags.append("PK")
@@ -122,27 +121,24 @@ async def wat_handler(message: Message, state: FSMContext):
                 flag_text = f" ({', '.join(flags)})" if flags else ""
                 lines.append(f"• <code>{name}</code> {col_type}{flag_text}")
 
-            # Row count
-            cur.execute(f"SELECT COUNT(*) FROM {table};")
-            count = cur.fetchone()[0]
-            lines.append(f"📊 Rows: <b>{count}</b>")
-
-            # Sample rows
-            cur.execute(f"SELECT * FROM {table} LIMIT {MAX_ROWS_PER_TABLE};")
+            # Row count + sample rows (one query; count rides in column 0)
+            cur.execute(
+                f"SELECT (SELECT COUNT(*) FROM {table}), * FROM {table} LIMIT {MAX_ROWS_PER_TABLE};"
+            )
             rows = cur.fetchall()
+            count = rows[0][0] if rows else 0
+            lines.append(f"📊 Rows: <b>{count}</b>")
 
             if rows:
                 lines.append(f"📦 Sample rows (up to {MAX_ROWS_PER_TABLE}):")
                 for i, row in enumerate(rows, 1):
-                    lines.append(f"{i}) <code>{row}</code>")
+                    lines.append(f"{i}) <code>{row[1:]}</code>")
             else:
                 lines.append("📦 No rows")
 
             lines.append("")
 
-        text = "\n".join(lines)
-
-        parts = _split_text_for_telegram(text)
+        parts = _split_lines_for_telegram(lines)
         for i, part in enumerate(parts, start=1):
             header = f"<b>🧠 SQLite Debug (part {i}/{len(parts)})</b>\n\n" if len(parts) > 1 else ""
             await message.answer(header + part, parse_mode="HTML")
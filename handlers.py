@@ -76,7 +76,7 @@ async def send_book_by_code(message: Message, code: str) -> bool:
             disable_web_page_preview=True
         )
     except Exception:
-        asyncio.create_task(_delete_later(message.bot, message.chat.id, sent.message_id))
+        _schedule_delete(message.bot, message.chat.id, sent.message_id)
         return True
 
     asyncio.create_task(
@@ -91,8 +91,15 @@ async def send_book_by_code(message: Message, code: str) -> bool:
     return True
 
 
-async def _delete_later(bot, chat_id, msg_id):
-    await asyncio.sleep(DELETE_SECONDS)
+def _schedule_delete(bot, chat_id, msg_id):
+    # timer on the loop's heap instead of a coroutine sleeping DELETE_SECONDS
+    asyncio.get_running_loop().call_later(
+        DELETE_SECONDS,
+        lambda: asyncio.create_task(_delete_now(bot, chat_id, msg_id)),
+    )
+
+
+async def _delete_now(bot, chat_id, msg_id):
     try:
         await bot.delete_message(chat_id, msg_id)
     except Exception: